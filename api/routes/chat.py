@@ -1,9 +1,11 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 import json
+import os
 import sys
 import time
 
@@ -17,6 +19,17 @@ router = APIRouter()
 # Global instance of the leadership coach service
 coach_service = LeadershipCoachService()
 
+# Upper bounds for /chat/batch; requests may ask for less concurrency, never more
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", "200"))
+
+# Shared across all batches so overlapping requests can't multiply the OpenAI
+# call rate; a dedicated pool keeps the default executor's size out of it
+batch_semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+batch_executor = ThreadPoolExecutor(
+    max_workers=BATCH_MAX_CONCURRENCY, thread_name_prefix="chat-batch"
+)
+
 
 class ChatMessage(BaseModel):
     message: str
@@ -28,6 +41,11 @@ class ChatResponse(BaseModel):
     session_id: Optional[str] = None
 
 
+class BatchChatRequest(BaseModel):
+    questions: List[str]
+    max_concurrency: Optional[int] = None
+
+
 @router.post("/chat")
 async def chat(chat_message: ChatMessage):
     """
@@ -97,6 +115,91 @@ print("**********************")
 print("**********************")
 
 
+@router.post("/chat/batch")
+async def chat_batch(batch_request: BatchChatRequest):
+    """
+    Answer independent questions concurrently without touching the shared history.
+    Results are streamed as NDJSON in completion order, tagged with their index.
+    """
+    questions = batch_request.questions
+    if not questions:
+        raise HTTPException(status_code=400, detail="No questions provided")
+    if len(questions) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many questions: {len(questions)} (max {BATCH_MAX_QUESTIONS})",
+        )
+
+    if batch_request.max_concurrency is None:
+        concurrency = BATCH_MAX_CONCURRENCY
+    else:
+        concurrency = min(batch_request.max_concurrency, BATCH_MAX_CONCURRENCY)
+    if concurrency < 1:
+        raise HTTPException(status_code=400, detail="max_concurrency must be >= 1")
+
+    # Per-request limit, nested inside the process-wide batch_semaphore
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def answer_question(index: int, question: str):
+        async with semaphore, batch_semaphore:
+            started = time.perf_counter()
+            result = {"index": index, "question": question}
+            try:
+                # answer() is blocking, so run it off the event loop
+                result["answer"] = await asyncio.get_running_loop().run_in_executor(
+                    batch_executor, coach_service.answer, question
+                )
+            except Exception as e:
+                result["error"] = str(e)
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return result
+
+    async def generate_results():
+        print(
+            f"[FASTAPI] Starting batch of {len(questions)} questions "
+            f"(concurrency {concurrency})",
+            flush=True,
+        )
+        batch_started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(answer_question(index, question))
+            for index, question in enumerate(questions)
+        ]
+        failed = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                if "error" in result:
+                    failed += 1
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+
+            total_ms = round((time.perf_counter() - batch_started) * 1000, 1)
+            yield json.dumps(
+                {
+                    "done": True,
+                    "total": len(questions),
+                    "failed": failed,
+                    "total_latency_ms": total_ms,
+                }
+            ) + "\n"
+            print(f"[FASTAPI] Batch complete in {total_ms} ms", flush=True)
+        finally:
+            # Client disconnected or finished: drop queued items. Requests
+            # already running in worker threads cannot be interrupted and
+            # finish in the background.
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        generate_results(),
+        media_type="application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+        },
+    )
+
+
 @router.post("/chat/reset")
 async def reset_chat():
     """
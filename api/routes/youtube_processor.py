@@ -1,6 +1,5 @@
 import asyncio
 import yt_dlp
-import whisper
 import os
 import tempfile
 import json
@@ -8,16 +7,56 @@ import re
 import glob
 from dotenv import load_dotenv
 from openai import OpenAI
-from typing import Optional
+from contextlib import nullcontext
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 import shutil
 
+try:
+    from api.utils.chunker import preview_chunking, validate_static_chunking
+    from api.utils.artifact_cache import (
+        ArtifactCache,
+        audio_key,
+        file_sha256,
+        transcript_key,
+    )
+    from api.utils.transcription import (
+        BACKENDS,
+        DEFAULT_MODEL,
+        MODEL_SIZES,
+        audio_duration,
+        get_backend,
+        load_benchmarks,
+        run_benchmark,
+        select_model_size,
+    )
+except ImportError:
+    from ..utils.chunker import preview_chunking, validate_static_chunking
+    from ..utils.artifact_cache import (
+        ArtifactCache,
+        audio_key,
+        file_sha256,
+        transcript_key,
+    )
+    from ..utils.transcription import (
+        BACKENDS,
+        DEFAULT_MODEL,
+        MODEL_SIZES,
+        audio_duration,
+        get_backend,
+        load_benchmarks,
+        run_benchmark,
+        select_model_size,
+    )
+
 # Load environment variables
 load_dotenv()
 
 router = APIRouter()
 
+AUDIO_FORMAT = "mp3"
+
 
 class YouTubeProcessRequest(BaseModel):
     playlist_url: str = (
@@ -29,6 +68,14 @@ class YouTubeProcessRequest(BaseModel):
     output_folder: str = (
         "/Users/ozgunsutemen/Ozgun/leadership_coach/api/youtube_list_text"
     )
+    whisper_model: str = "small"  # or "auto" to size by duration and target
+    language: str = "tr"
+    use_cache: bool = True
+    transcription_backend: str = "whisper"  # "whisper" or "whisper-int8"
+    num_threads: Optional[int] = None
+    # Throughput targets for "auto": seconds allowed per video, or max RTF
+    time_budget_seconds: Optional[float] = None
+    target_rtf: Optional[float] = None
 
 
 class YouTubeProcessResponse(BaseModel):
@@ -39,7 +86,78 @@ class YouTubeProcessResponse(BaseModel):
     transcription_files: list = []
 
 
-def download_audio(url, index):
+class BenchmarkSample(BaseModel):
+    audio_path: str
+    reference_text: str
+
+
+class TranscriptionBenchmarkRequest(BaseModel):
+    samples: List[BenchmarkSample]
+    backends: List[str] = ["whisper", "whisper-int8"]
+    models: List[str] = ["tiny", "base", "small"]
+    language: str = "tr"
+    num_threads: Optional[int] = None
+
+
+class ChunkSettings(BaseModel):
+    max_chunk_size_tokens: int = 800
+    chunk_overlap_tokens: int = 400
+
+
+class ChunkPreviewRequest(BaseModel):
+    output_folder: str = (
+        "/Users/ozgunsutemen/Ozgun/leadership_coach/api/youtube_list_text"
+    )
+    settings: List[ChunkSettings] = [ChunkSettings()]
+
+
+class ChunkPreviewResponse(BaseModel):
+    success: bool
+    message: str
+    results: list = []
+
+
+def extract_video_id(url):
+    """Extracts the YouTube video ID from a URL, falling back to the URL itself."""
+    match = re.search(r"(?:v=|youtu\.be/|shorts/)([\w-]{11})", url)
+    return match.group(1) if match else url
+
+
+def audio_cache_key(url):
+    """Artifact cache key for a video's downloaded audio."""
+    return audio_key(extract_video_id(url), AUDIO_FORMAT)
+
+
+def download_audio(url, index, cache=None):
+    """Downloads audio from YouTube video, reusing the artifact cache when given."""
+    if cache is None:
+        return download_audio_to_temp(url, index)
+
+    key = audio_cache_key(url)
+    suffix = f".{AUDIO_FORMAT}"
+    cached_path = cache.get(key, suffix)
+    if cached_path:
+        print(f"Audio cache hit: {cached_path}")
+        return cached_path
+
+    with cache.lock(key):
+        # Another worker may have downloaded it while we waited for the lock
+        cached_path = cache.get(key, suffix)
+        if cached_path:
+            print(f"Audio cache hit: {cached_path}")
+            return cached_path
+
+        temp_audio_path = download_audio_to_temp(url, index)
+        if not temp_audio_path or not temp_audio_path.endswith(suffix):
+            return temp_audio_path
+
+        cached_path = cache.put_file(key, temp_audio_path, suffix)
+        shutil.rmtree(os.path.dirname(temp_audio_path), ignore_errors=True)
+        print(f"Audio cached: {cached_path}")
+        return cached_path
+
+
+def download_audio_to_temp(url, index):
     """Downloads audio from YouTube video temporarily."""
     temp_dir = tempfile.mkdtemp()
     temp_audio_file = os.path.join(temp_dir, f"audio_{index}")
@@ -50,7 +168,7 @@ def download_audio(url, index):
         "postprocessors": [
             {
                 "key": "FFmpegExtractAudio",
-                "preferredcodec": "mp3",
+                "preferredcodec": AUDIO_FORMAT,
                 "preferredquality": "192",
             }
         ],
@@ -62,7 +180,7 @@ def download_audio(url, index):
             ydl.download([url])
 
         # Find the downloaded file
-        final_audio_file = temp_audio_file + ".mp3"
+        final_audio_file = f"{temp_audio_file}.{AUDIO_FORMAT}"
 
         # Check if the file exists
         if os.path.exists(final_audio_file):
@@ -79,9 +197,23 @@ def download_audio(url, index):
         return None
 
 
-def transcribe_audio(audio_path):
-    """Converts audio file to text."""
+def transcribe_audio(
+    audio_path,
+    model_name=DEFAULT_MODEL,
+    language="tr",
+    cache=None,
+    backend=None,
+    target_rtf=None,
+    time_budget_seconds=None,
+):
+    """Converts audio file to text, reusing cached transcripts when available."""
+    backend = backend or get_backend()
     temp_dir = None
+    is_cached_audio = (
+        cache is not None
+        and audio_path is not None
+        and os.path.dirname(audio_path) == cache.data_dir
+    )
     try:
         if not os.path.exists(audio_path):
             print(f"Audio file not found: {audio_path}")
@@ -90,16 +222,44 @@ def transcribe_audio(audio_path):
         temp_dir = os.path.dirname(audio_path)
         print(f"Audio file found: {audio_path}")
 
-        model = whisper.load_model("small")
-        result = model.transcribe(audio_path, language="tr")
-        return result["text"]
+        if model_name == "auto":
+            # Duration only matters when a per-video time budget is set
+            duration = audio_duration(audio_path) if time_budget_seconds else None
+            model_name = select_model_size(
+                backend.name,
+                language,
+                duration_seconds=duration,
+                target_rtf=target_rtf,
+                time_budget_seconds=time_budget_seconds,
+            )
+            print(f"Auto-selected model '{model_name}'")
+
+        if cache is None:
+            return backend.transcribe(audio_path, model_name, language)
+
+        key = transcript_key(
+            file_sha256(audio_path), backend.cache_model_id(model_name), language
+        )
+        text = cache.get_text(key)
+        if text is not None:
+            print(f"Transcript cache hit ({model_name}, {language})")
+            return text
+
+        with cache.lock(key):
+            text = cache.get_text(key)
+            if text is None:
+                text = backend.transcribe(audio_path, model_name, language)
+                cache.put_text(key, text)
+            return text
     except Exception as e:
         print(f"Transcription error: {e}")
         return None
     finally:
-        # Delete temporary file and folder
+        # Delete temporary file and folder; cached audio is kept for reuse
         try:
-            if audio_path and os.path.exists(audio_path):
+            if is_cached_audio:
+                temp_dir = None
+            elif audio_path and os.path.exists(audio_path):
                 os.remove(audio_path)
                 print(f"Audio file deleted: {audio_path}")
             if temp_dir and os.path.exists(temp_dir):
@@ -202,7 +362,17 @@ def sanitize_filename(filename):
     return filename
 
 
-def playlist_to_text(playlist_url, output_folder="speakers", max_videos=None):
+def playlist_to_text(
+    playlist_url,
+    output_folder="speakers",
+    max_videos=None,
+    whisper_model=DEFAULT_MODEL,
+    language="tr",
+    cache=None,
+    backend=None,
+    target_rtf=None,
+    time_budget_seconds=None,
+):
     """Converts YouTube playlist videos to text and creates separate Markdown files for each speaker."""
     # Ensure speakers folder exists
     os.makedirs(output_folder, exist_ok=True)
@@ -227,14 +397,25 @@ def playlist_to_text(playlist_url, output_folder="speakers", max_videos=None):
         print(f"Speaker: {speaker_name}")
         print("Downloading audio...")
 
-        audio_path = download_audio(video_url, index)
-        if not audio_path:
-            transcription_text = "Audio could not be downloaded."
-        else:
-            print("Converting to text...")
-            transcription_text = transcribe_audio(audio_path)
-            if not transcription_text:
-                transcription_text = "Text conversion failed."
+        # Pin cached audio so other workers can't evict it mid-transcription
+        pin = cache.pin(audio_cache_key(video_url)) if cache else nullcontext()
+        with pin:
+            audio_path = download_audio(video_url, index, cache)
+            if not audio_path:
+                transcription_text = "Audio could not be downloaded."
+            else:
+                print("Converting to text...")
+                transcription_text = transcribe_audio(
+                    audio_path,
+                    whisper_model,
+                    language,
+                    cache,
+                    backend,
+                    target_rtf,
+                    time_budget_seconds,
+                )
+                if not transcription_text:
+                    transcription_text = "Text conversion failed."
 
         # Create separate file for each speaker
         output_file = os.path.join(output_folder, f"{safe_speaker_name}.md")
@@ -347,11 +528,27 @@ async def process_youtube_playlist(request: YouTubeProcessRequest):
         print(f"Output folder: {request.output_folder}")
         print(f"Chunk size: {request.max_chunk_size_tokens}")
         print(f"Chunk overlap: {request.chunk_overlap_tokens}")
+        print(f"Whisper model: {request.whisper_model} ({request.language})")
+        print(f"Transcription backend: {request.transcription_backend}")
+
+        backend = get_backend(request.transcription_backend, request.num_threads)
+
+        cache = ArtifactCache.from_env() if request.use_cache else None
+        if cache is not None:
+            print(f"Artifact cache: {cache.root} (max {cache.max_bytes} bytes)")
 
         # Step 1: Process YouTube playlist and create transcriptions
         print("\n=== Step 1: Processing YouTube Playlist ===")
         transcriptions = playlist_to_text(
-            request.playlist_url, request.output_folder, max_videos=request.max_videos
+            request.playlist_url,
+            request.output_folder,
+            max_videos=request.max_videos,
+            whisper_model=request.whisper_model,
+            language=request.language,
+            cache=cache,
+            backend=backend,
+            target_rtf=request.target_rtf,
+            time_budget_seconds=request.time_budget_seconds,
         )
 
         if not transcriptions:
@@ -412,6 +609,116 @@ async def process_youtube_playlist_endpoint(request: YouTubeProcessRequest):
         )
 
 
+@router.post("/transcription-benchmark")
+async def transcription_benchmark_endpoint(request: TranscriptionBenchmarkRequest):
+    """
+    Benchmark transcription backends and models against reference transcripts.
+
+    Measures real-time factor and word-error rate, saves them to the benchmark
+    table used for automatic model selection, and returns the full table.
+    """
+    unknown = [name for name in request.backends if name not in BACKENDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown backends: {unknown}")
+    # Fail before any run; rows are only saved once every model has finished
+    unknown_models = [name for name in request.models if name not in MODEL_SIZES]
+    if unknown_models:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown models: {unknown_models}. Available: {MODEL_SIZES}",
+        )
+    if not request.samples:
+        raise HTTPException(status_code=400, detail="No reference samples provided")
+    missing = [
+        sample.audio_path
+        for sample in request.samples
+        if not os.path.exists(sample.audio_path)
+    ]
+    if missing:
+        raise HTTPException(
+            status_code=400, detail=f"Missing reference audio: {missing}"
+        )
+
+    try:
+        rows = await asyncio.to_thread(
+            run_benchmark,
+            [sample.model_dump() for sample in request.samples],
+            request.backends,
+            request.models,
+            request.language,
+            request.num_threads,
+        )
+        return {"benchmarks": rows}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error running benchmark: {str(e)}"
+        )
+
+
+@router.get("/transcription-benchmark")
+async def get_transcription_benchmarks():
+    """Return the saved transcription benchmark table."""
+    return {"benchmarks": load_benchmarks()}
+
+
+@router.post("/chunk-preview", response_model=ChunkPreviewResponse)
+async def chunk_preview_endpoint(request: ChunkPreviewRequest):
+    """
+    Preview chunking of speaker files for one or more settings.
+
+    Reports chunk counts, total indexed tokens and the duplication ratio
+    caused by overlap, without uploading anything to the vector store.
+    Top-level numbers come from the local sentence-based chunker; the
+    upload still uses the vector store's static chunker, which
+    "remote_static_estimate" approximates.
+    """
+    if not os.path.exists(request.output_folder):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Speakers directory '{request.output_folder}' does not exist",
+        )
+
+    # Reject settings the vector store upload would refuse before any work
+    try:
+        for settings in request.settings:
+            validate_static_chunking(
+                settings.max_chunk_size_tokens, settings.chunk_overlap_tokens
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    file_paths = sorted(glob.glob(os.path.join(request.output_folder, "*.md")))
+    if not file_paths:
+        return ChunkPreviewResponse(
+            success=False,
+            message=f"No markdown files found in '{request.output_folder}'",
+        )
+
+    try:
+        results = []
+        for settings in request.settings:
+            results.append(
+                await asyncio.to_thread(
+                    preview_chunking,
+                    file_paths,
+                    settings.max_chunk_size_tokens,
+                    settings.chunk_overlap_tokens,
+                )
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error previewing chunks: {str(e)}"
+        )
+
+    return ChunkPreviewResponse(
+        success=True,
+        message=f"Previewed {len(results)} chunking settings",
+        results=results,
+    )
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint for YouTube processor."""
@@ -1,7 +1,7 @@
 from openai import OpenAI
 import os
 from dotenv import load_dotenv
-from typing import List, Dict, Any, AsyncGenerator
+from typing import List, Dict, Any, AsyncGenerator, Iterator, Tuple
 
 try:
     from api.utils.prompt import TOOLS, SYSTEM_PROMPT
@@ -16,6 +16,34 @@ class LeadershipCoachService:
         self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.conversation_history = [{"role": "system", "content": SYSTEM_PROMPT}]
 
+    def _stream_text(
+        self, conversation: List[Dict[str, Any]]
+    ) -> Iterator[Tuple[str, bool]]:
+        """
+        Run a single model turn over the given input.
+        Yields (text, is_error) pairs as stream events arrive.
+        """
+        # Query the OpenAI responses.stream endpoint with tools enabled
+        with self.client.responses.stream(
+            model="gpt-4.1",
+            input=conversation,
+            text={"format": {"type": "text"}},
+            reasoning={},
+            tools=TOOLS,
+            temperature=0.6,
+            tool_choice="auto",
+            max_output_tokens=2048,
+            top_p=1,
+            store=True,
+        ) as stream:
+            for event in stream:
+                if event.type == "response.refusal.delta":
+                    yield event.delta, False
+                elif event.type == "response.output_text.delta":
+                    yield event.delta, False
+                elif event.type == "response.error":
+                    yield f"Error: {event.error}", True
+
     async def chat_stream(self, message: str) -> AsyncGenerator[str, None]:
         """
         Stream chat responses from the leadership coach.
@@ -29,47 +57,45 @@ class LeadershipCoachService:
         response_content = []
 
         try:
-            # Query the OpenAI responses.stream endpoint with tools enabled
-            with self.client.responses.stream(
-                model="gpt-4.1",
-                input=self.conversation_history,
-                text={"format": {"type": "text"}},
-                reasoning={},
-                tools=TOOLS,
-                temperature=0.6,
-                tool_choice="auto",
-                max_output_tokens=2048,
-                top_p=1,
-                store=True,
-            ) as stream:
-                for event in stream:
-                    if event.type == "response.refusal.delta":
-                        yield event.delta
-                        response_content.append({"type": "text", "text": event.delta})
-                    elif event.type == "response.output_text.delta":
-                        yield event.delta
-                        response_content.append({"type": "text", "text": event.delta})
-                    elif event.type == "response.error":
-                        yield f"Error: {event.error}"
+            for delta, is_error in self._stream_text(self.conversation_history):
+                yield delta
+                if not is_error:
+                    response_content.append({"type": "text", "text": delta})
 
-                # Add assistant reply to the conversation history
-                if response_content:
-                    # Combine all text content into a single block
-                    combined_text = "".join(
-                        block["text"]
-                        for block in response_content
-                        if block.get("type") == "text"
-                    )
-                    self.conversation_history.append(
-                        {
-                            "role": "assistant",
-                            "content": [{"type": "output_text", "text": combined_text}],
-                        }
-                    )
+            # Add assistant reply to the conversation history
+            if response_content:
+                # Combine all text content into a single block
+                combined_text = "".join(
+                    block["text"]
+                    for block in response_content
+                    if block.get("type") == "text"
+                )
+                self.conversation_history.append(
+                    {
+                        "role": "assistant",
+                        "content": [{"type": "output_text", "text": combined_text}],
+                    }
+                )
 
         except Exception as e:
             yield f"Error occurred: {str(e)}"
 
+    def answer(self, message: str) -> str:
+        """
+        Answer a single question without reading or updating the shared history.
+        Blocking; run it in a worker thread from async code.
+        """
+        conversation = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": [{"type": "input_text", "text": message}]},
+        ]
+        chunks = []
+        for delta, is_error in self._stream_text(conversation):
+            if is_error:
+                raise RuntimeError(delta)
+            chunks.append(delta)
+        return "".join(chunks)
+
     def reset_conversation(self):
         """Reset the conversation history to start fresh."""
         self.conversation_history = [{"role": "system", "content": SYSTEM_PROMPT}]
@@ -0,0 +1,285 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import IO, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    from api.utils.hashing import file_sha256
+except ImportError:
+    from .hashing import file_sha256
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "leadership_coach", "artifacts"
+)
+DEFAULT_MAX_BYTES = 5 * 1024**3
+
+_LOCK_EX = fcntl.LOCK_EX if fcntl is not None else 0
+_LOCK_SH = fcntl.LOCK_SH if fcntl is not None else 0
+
+
+def audio_key(video_id: str, audio_format: str) -> str:
+    """Cache key for downloaded audio of a video in a given format."""
+    return f"audio:{video_id}:{audio_format}"
+
+
+def transcript_key(audio_hash: str, model: str, language: str) -> str:
+    """Cache key for a transcript of specific audio content."""
+    return f"transcript:{audio_hash}:{model}:{language}"
+
+
+class ArtifactCache:
+    """
+    Content-addressed on-disk cache for pipeline artifacts.
+
+    Entries are files named by the SHA-256 of their key. Writes go through a
+    temporary file and os.replace, so readers never see partial files. Total
+    size is capped at max_bytes; least recently used entries are evicted
+    first. Per-key file locks keep parallel workers from producing the same
+    artifact twice, and pinned or locked entries are never evicted.
+    """
+
+    def __init__(
+        self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.data_dir = os.path.join(root, "data")
+        self.lock_dir = os.path.join(root, "locks")
+        os.makedirs(self.data_dir, exist_ok=True)
+        os.makedirs(self.lock_dir, exist_ok=True)
+        self._thread_locks = {}
+        self._thread_locks_guard = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ArtifactCache":
+        """Builds a cache from ARTIFACT_CACHE_DIR and ARTIFACT_CACHE_MAX_BYTES."""
+        return cls(
+            os.path.expanduser(os.getenv("ARTIFACT_CACHE_DIR", DEFAULT_CACHE_DIR)),
+            int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES))),
+        )
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str, suffix: str = "") -> str:
+        """Returns where the entry for key is (or would be) stored."""
+        return os.path.join(self.data_dir, self._digest(key) + suffix)
+
+    def get(self, key: str, suffix: str = "") -> Optional[str]:
+        """Returns the path of a cached entry and marks it as recently used."""
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_text(self, key: str) -> Optional[str]:
+        """Returns a cached text entry, or None on a miss."""
+        path = self.get(key, ".txt")
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put_file(self, key: str, src_path: str, suffix: str = "") -> str:
+        """Moves src_path into the cache atomically and returns the entry path."""
+        path = self.path_for(key, suffix)
+        fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.move(src_path, tmp_path)
+            os.replace(tmp_path, path)
+            # Moves keep the source mtime (yt-dlp may set it to the upload
+            # date); LRU order relies on mtime, so mark the entry as new
+            os.utime(path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict(keep=path)
+        return path
+
+    def put_text(self, key: str, text: str) -> str:
+        """Writes a text entry atomically and returns its path."""
+        path = self.path_for(key, ".txt")
+        fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            os.utime(path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict(keep=path)
+        return path
+
+    def _thread_lock(self, digest: str) -> threading.Lock:
+        with self._thread_locks_guard:
+            return self._thread_locks.setdefault(digest, threading.Lock())
+
+    def _lock_path(self, digest: str, kind: str) -> str:
+        return os.path.join(self.lock_dir, f"{digest}.{kind}")
+
+    def _open_locked(self, path: str, operation: int) -> IO:
+        """
+        Opens path and flocks it, retrying if eviction unlinked the file
+        while we waited, so every holder locks the same inode.
+        """
+        while True:
+            lock_file = open(path, "a")
+            if fcntl is None:
+                return lock_file
+            fcntl.flock(lock_file, operation)
+            try:
+                if os.fstat(lock_file.fileno()).st_ino == os.stat(path).st_ino:
+                    return lock_file
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        Holds an exclusive lock for key across threads and processes.
+        Check the cache again after acquiring it; another worker may have
+        produced the entry while this one was waiting.
+        """
+        digest = self._digest(key)
+        lock_path = self._lock_path(digest, "lock")
+        with self._thread_lock(digest):
+            with self._open_locked(lock_path, _LOCK_EX) as lock_file:
+                try:
+                    yield
+                finally:
+                    self._unlink_if_idle(lock_path, lock_file)
+
+    @contextmanager
+    def pin(self, key: str) -> Iterator[None]:
+        """
+        Keeps the entry for key from being evicted while it is in use.
+        Pins are shared, and independent of lock(), so a worker can pin an
+        entry before producing it under lock().
+        """
+        pin_path = self._lock_path(self._digest(key), "pin")
+        with self._open_locked(pin_path, _LOCK_SH) as pin_file:
+            try:
+                yield
+            finally:
+                self._unlink_if_idle(pin_path, pin_file)
+
+    @staticmethod
+    def _unlink_if_idle(path: str, lock_file: IO) -> bool:
+        """
+        Removes a lock file we have open if nobody else holds it. Waiters
+        that already opened it notice the unlinked inode and retry.
+        """
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+        try:
+            # Only remove the file if the path still points at our inode
+            if os.fstat(lock_file.fileno()).st_ino == os.stat(path).st_ino:
+                os.remove(path)
+                return True
+        except FileNotFoundError:
+            pass
+        return False
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for name in os.listdir(self.data_dir):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.data_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _remove_unlocked(self, path: str) -> bool:
+        """
+        Deletes an entry and its lock files unless a worker currently holds
+        its key lock or a pin on it.
+        """
+        digest = os.path.basename(path).split(".", 1)[0]
+        held = []
+        try:
+            for kind in ("lock", "pin"):
+                lock_path = self._lock_path(digest, kind)
+                lock_file = open(lock_path, "a")
+                held.append((lock_path, lock_file))
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        held.pop()
+                        lock_file.close()
+                        return False
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return True
+        finally:
+            # Drop lock files we hold, whether or not the entry went away;
+            # closing releases the flocks and waiters see the unlinked inode
+            for lock_path, lock_file in held:
+                self._unlink_if_idle(lock_path, lock_file)
+                lock_file.close()
+
+    def _sweep_locks(self, entry_digests: set):
+        """Removes idle lock and pin files whose entry no longer exists."""
+        for name in os.listdir(self.lock_dir):
+            if name.split(".", 1)[0] in entry_digests:
+                continue
+            lock_path = os.path.join(self.lock_dir, name)
+            try:
+                lock_file = open(lock_path, "r")
+            except FileNotFoundError:
+                continue
+            with lock_file:
+                self._unlink_if_idle(lock_path, lock_file)
+
+    def size(self) -> int:
+        """Total bytes currently stored."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Removes least recently used entries until under max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep or not self._remove_unlocked(path):
+                continue
+            total -= size
+            freed += size
+            print(f"Evicted cache entry: {os.path.basename(path)} ({size} bytes)")
+
+        # Failed downloads and interrupted workers can leave lock files behind
+        self._sweep_locks(
+            {os.path.basename(p).split(".", 1)[0] for _, _, p in self._entries()}
+        )
+        return freed
@@ -0,0 +1,345 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+try:
+    from api.utils.hashing import file_sha256
+except ImportError:
+    from .hashing import file_sha256
+
+# Encoding used by the GPT-4.1 family; falls back to a regex estimate offline
+DEFAULT_ENCODING = "o200k_base"
+
+# Read transcripts in fixed-size blocks so a single-line transcript stays bounded
+READ_BLOCK_SIZE = 64 * 1024
+
+# Longest unterminated text kept before it is flushed at the last whitespace
+MAX_SENTENCE_CHARS = 16 * 1024
+
+# Limits of the vector store's static chunking strategy
+STATIC_MIN_CHUNK_TOKENS = 100
+STATIC_MAX_CHUNK_TOKENS = 4096
+
+# Maximum number of (content hash, parameters) entries kept in memory
+CHUNK_CACHE_SIZE = 256
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|\n+")
+APPROX_TOKEN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+_encoders: Dict[str, object] = {}
+_chunk_cache: "OrderedDict[Tuple, Dict[str, int]]" = OrderedDict()
+_chunk_cache_lock = threading.Lock()
+
+
+def _get_encoder(encoding_name: str):
+    """Returns a cached tiktoken encoder, or None when it cannot be loaded."""
+    if tiktoken is None:
+        return None
+    if encoding_name not in _encoders:
+        try:
+            _encoders[encoding_name] = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            print(f"Tokenizer unavailable, using approximate token counts: {e}")
+            _encoders[encoding_name] = None
+    return _encoders[encoding_name]
+
+
+def count_tokens(text: str, encoding_name: str = DEFAULT_ENCODING) -> int:
+    """Counts tokens locally without calling the API."""
+    encoder = _get_encoder(encoding_name)
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return len(APPROX_TOKEN.findall(text))
+
+
+def iter_sentences(
+    path: str,
+    block_size: int = READ_BLOCK_SIZE,
+    max_sentence_chars: int = MAX_SENTENCE_CHARS,
+) -> Iterator[str]:
+    """
+    Yields sentences from a text file, reading it in fixed-size blocks.
+
+    Text without sentence punctuation is flushed at the last whitespace once
+    it exceeds max_sentence_chars, so memory stays bounded by
+    block_size + max_sentence_chars.
+    """
+    buffer = ""
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            buffer += block
+            parts = SENTENCE_BOUNDARY.split(buffer)
+            # The last part may be an unfinished sentence; keep it for the next block
+            buffer = parts.pop()
+            for part in parts:
+                sentence = part.strip()
+                if sentence:
+                    yield sentence
+
+            while len(buffer) > max_sentence_chars:
+                cut = buffer.rfind(" ", 0, max_sentence_chars)
+                if cut <= 0:
+                    cut = max_sentence_chars
+                sentence = buffer[:cut].strip()
+                buffer = buffer[cut:]
+                if sentence:
+                    yield sentence
+
+    sentence = buffer.strip()
+    if sentence:
+        yield sentence
+
+
+def _split_oversized(
+    sentence: str, max_tokens: int, encoding_name: str
+) -> Iterator[Tuple[str, int]]:
+    """Splits a sentence longer than max_tokens on word boundaries."""
+    words: List[str] = []
+    word_tokens = 0
+    for word in sentence.split():
+        tokens = count_tokens(word, encoding_name)
+        if words and word_tokens + tokens > max_tokens:
+            yield " ".join(words), word_tokens
+            words, word_tokens = [], 0
+        words.append(word)
+        word_tokens += tokens
+    if words:
+        yield " ".join(words), word_tokens
+
+
+def chunk_sentences(
+    sentences: Iterable[str],
+    max_chunk_size_tokens: int = 800,
+    chunk_overlap_tokens: int = 400,
+    encoding_name: str = DEFAULT_ENCODING,
+) -> Iterator[Dict[str, object]]:
+    """
+    Groups sentences into chunks of at most max_chunk_size_tokens.
+
+    Consecutive chunks share trailing sentences worth up to
+    chunk_overlap_tokens. Only the sentences of the current chunk are held
+    in memory. Each chunk reports "new_tokens", the tokens not carried over
+    from the previous chunk, so their sum is the source token count.
+    """
+    if max_chunk_size_tokens <= 0:
+        raise ValueError("max_chunk_size_tokens must be positive")
+    if chunk_overlap_tokens < 0 or chunk_overlap_tokens >= max_chunk_size_tokens:
+        raise ValueError(
+            "chunk_overlap_tokens must be between 0 and max_chunk_size_tokens - 1"
+        )
+
+    window: List[Tuple[str, int]] = []
+    window_tokens = 0
+    carried_tokens = 0
+
+    def pieces():
+        for sentence in sentences:
+            tokens = count_tokens(sentence, encoding_name)
+            if tokens > max_chunk_size_tokens:
+                yield from _split_oversized(
+                    sentence, max_chunk_size_tokens, encoding_name
+                )
+            else:
+                yield sentence, tokens
+
+    for sentence, tokens in pieces():
+        if window and window_tokens + tokens > max_chunk_size_tokens:
+            yield {
+                "text": " ".join(text for text, _ in window),
+                "tokens": window_tokens,
+                "new_tokens": window_tokens - carried_tokens,
+            }
+
+            # Carry trailing sentences over as overlap for the next chunk
+            overlap: List[Tuple[str, int]] = []
+            overlap_tokens = 0
+            for text, text_tokens in reversed(window):
+                if overlap_tokens + text_tokens > chunk_overlap_tokens:
+                    break
+                overlap.insert(0, (text, text_tokens))
+                overlap_tokens += text_tokens
+
+            # Drop overlap that would leave no room for the incoming sentence
+            while overlap and overlap_tokens + tokens > max_chunk_size_tokens:
+                overlap_tokens -= overlap.pop(0)[1]
+
+            window, window_tokens = overlap, overlap_tokens
+            carried_tokens = overlap_tokens
+
+        window.append((sentence, tokens))
+        window_tokens += tokens
+
+    if window:
+        yield {
+            "text": " ".join(text for text, _ in window),
+            "tokens": window_tokens,
+            "new_tokens": window_tokens - carried_tokens,
+        }
+
+
+def chunk_file(
+    path: str,
+    max_chunk_size_tokens: int = 800,
+    chunk_overlap_tokens: int = 400,
+    encoding_name: str = DEFAULT_ENCODING,
+) -> Iterator[Dict[str, object]]:
+    """Streams token-bounded chunks from a speaker transcript file."""
+    return chunk_sentences(
+        iter_sentences(path),
+        max_chunk_size_tokens,
+        chunk_overlap_tokens,
+        encoding_name,
+    )
+
+
+def chunk_file_stats(
+    path: str,
+    max_chunk_size_tokens: int = 800,
+    chunk_overlap_tokens: int = 400,
+    encoding_name: str = DEFAULT_ENCODING,
+) -> Dict[str, int]:
+    """
+    Returns chunk count and token totals for a file.
+
+    The file is read once to hash it and once to chunk it. Results are cached
+    by content hash and chunking parameters, so unchanged files are not
+    re-tokenized when comparing settings.
+    """
+    key = (
+        file_sha256(path),
+        max_chunk_size_tokens,
+        chunk_overlap_tokens,
+        encoding_name,
+    )
+    # Previews run in worker threads; keep get/move/evict atomic
+    with _chunk_cache_lock:
+        cached = _chunk_cache.get(key)
+        if cached is not None:
+            _chunk_cache.move_to_end(key)
+            return dict(cached)
+
+    chunk_count = 0
+    source_tokens = 0
+    indexed_tokens = 0
+    for chunk in chunk_file(
+        path, max_chunk_size_tokens, chunk_overlap_tokens, encoding_name
+    ):
+        chunk_count += 1
+        source_tokens += chunk["new_tokens"]
+        indexed_tokens += chunk["tokens"]
+
+    stats = {
+        "chunk_count": chunk_count,
+        "source_tokens": source_tokens,
+        "total_indexed_tokens": indexed_tokens,
+    }
+    with _chunk_cache_lock:
+        _chunk_cache[key] = stats
+        _chunk_cache.move_to_end(key)
+        if len(_chunk_cache) > CHUNK_CACHE_SIZE:
+            _chunk_cache.popitem(last=False)
+    return dict(stats)
+
+
+def validate_static_chunking(max_chunk_size_tokens: int, chunk_overlap_tokens: int):
+    """
+    Raises ValueError for settings the vector store's static chunking strategy
+    rejects, so a previewed setting can always be uploaded.
+    """
+    if not (
+        STATIC_MIN_CHUNK_TOKENS <= max_chunk_size_tokens <= STATIC_MAX_CHUNK_TOKENS
+    ):
+        raise ValueError(
+            f"max_chunk_size_tokens must be between {STATIC_MIN_CHUNK_TOKENS} "
+            f"and {STATIC_MAX_CHUNK_TOKENS}, got {max_chunk_size_tokens}"
+        )
+    if not 0 <= chunk_overlap_tokens <= max_chunk_size_tokens // 2:
+        raise ValueError(
+            "chunk_overlap_tokens must be between 0 and half of "
+            f"max_chunk_size_tokens ({max_chunk_size_tokens // 2}), "
+            f"got {chunk_overlap_tokens}"
+        )
+
+
+def estimate_static_chunking(
+    source_tokens: int, max_chunk_size_tokens: int, chunk_overlap_tokens: int
+) -> Tuple[int, int]:
+    """
+    Estimates (chunk count, indexed tokens) for one file under the vector
+    store's static chunker, which slides a fixed token window with a stride
+    of max_chunk_size_tokens - chunk_overlap_tokens.
+    """
+    if source_tokens <= 0:
+        return 0, 0
+    if source_tokens <= max_chunk_size_tokens:
+        return 1, source_tokens
+    stride = max_chunk_size_tokens - chunk_overlap_tokens
+    chunk_count = -(-(source_tokens - chunk_overlap_tokens) // stride)
+    return chunk_count, source_tokens + (chunk_count - 1) * chunk_overlap_tokens
+
+
+def _duplication_ratio(source_tokens: int, indexed_tokens: int) -> float:
+    if not indexed_tokens:
+        return 0.0
+    return round(max(indexed_tokens - source_tokens, 0) / indexed_tokens, 4)
+
+
+def preview_chunking(
+    file_paths: List[str],
+    max_chunk_size_tokens: int = 800,
+    chunk_overlap_tokens: int = 400,
+    encoding_name: Optional[str] = None,
+) -> Dict[str, object]:
+    """
+    Summarizes how a set of files would be chunked with the given settings.
+
+    Top-level counts come from the local sentence-based chunker.
+    create_vector_store_and_upload still uploads whole files and lets the
+    vector store's static token-window chunker split them, so
+    "remote_static_estimate" approximates what will actually be indexed.
+    Both are estimates: the remote tokenizer may count slightly differently.
+
+    duplication_ratio is the share of indexed tokens that are repeated
+    overlap, e.g. 0.5 means half of the indexed tokens are duplicates.
+    """
+    encoding_name = encoding_name or DEFAULT_ENCODING
+    totals = {"chunk_count": 0, "source_tokens": 0, "total_indexed_tokens": 0}
+    remote = {"chunk_count": 0, "total_indexed_tokens": 0}
+    for path in file_paths:
+        stats = chunk_file_stats(
+            path, max_chunk_size_tokens, chunk_overlap_tokens, encoding_name
+        )
+        for name in totals:
+            totals[name] += stats[name]
+
+        remote_chunks, remote_tokens = estimate_static_chunking(
+            stats["source_tokens"], max_chunk_size_tokens, chunk_overlap_tokens
+        )
+        remote["chunk_count"] += remote_chunks
+        remote["total_indexed_tokens"] += remote_tokens
+
+    source = totals["source_tokens"]
+    return {
+        "max_chunk_size_tokens": max_chunk_size_tokens,
+        "chunk_overlap_tokens": chunk_overlap_tokens,
+        "file_count": len(file_paths),
+        **totals,
+        "duplication_ratio": _duplication_ratio(
+            source, totals["total_indexed_tokens"]
+        ),
+        "remote_static_estimate": {
+            **remote,
+            "duplication_ratio": _duplication_ratio(
+                source, remote["total_indexed_tokens"]
+            ),
+        },
+    }
@@ -0,0 +1,12 @@
+import hashlib
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str, block_size: int = HASH_BLOCK_SIZE) -> str:
+    """Computes the SHA-256 of a file without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,331 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import ffmpeg
+import torch
+import whisper
+
+# Whisper checkpoints from fastest/least accurate to slowest/most accurate
+MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+DEFAULT_MODEL = "small"
+
+# Throughput target for "auto" when none is given: at least real time
+REALTIME_RTF = 1.0
+
+BENCHMARK_PATH = os.path.expanduser(
+    os.getenv(
+        "TRANSCRIPTION_BENCHMARK_PATH",
+        os.path.join(
+            os.path.expanduser("~"),
+            ".cache",
+            "leadership_coach",
+            "transcription_benchmarks.json",
+        ),
+    )
+)
+
+_benchmarks_lock = threading.Lock()
+
+
+class TranscriptionBackend(ABC):
+    """
+    Base class for speech-to-text backends used by transcribe_audio.
+
+    Loaded models are kept per backend instance, so one worker process
+    loads each checkpoint once instead of once per video. Whisper installs
+    kv-cache hooks on the model while decoding, so each model transcribes
+    one file at a time.
+    """
+
+    # Set by subclasses; used in logs, BACKENDS and transcript cache keys
+    name: str
+
+    def __init__(self):
+        self._models = {}
+        self._model_locks = {}
+        self._models_guard = threading.Lock()
+
+    def cache_model_id(self, model_name: str) -> str:
+        """Model identifier used in transcript cache keys."""
+        return f"{self.name}:{model_name}"
+
+    @abstractmethod
+    def load_model(self, model_name: str):
+        """Loads a checkpoint prepared for this backend."""
+
+    def _model_lock(self, model_name: str) -> threading.Lock:
+        with self._models_guard:
+            return self._model_locks.setdefault(model_name, threading.Lock())
+
+    def get_model(self, model_name: str):
+        with self._model_lock(model_name):
+            if model_name not in self._models:
+                print(f"Loading {self.name} model '{model_name}'...")
+                self._models[model_name] = self.load_model(model_name)
+            return self._models[model_name]
+
+    def transcribe(self, audio_path: str, model_name: str, language: str) -> str:
+        model = self.get_model(model_name)
+        with self._model_lock(model_name):
+            # fp16 is only supported on GPU; on CPU it just emits a warning
+            result = model.transcribe(
+                audio_path, language=language, fp16=model.device.type == "cuda"
+            )
+        return result["text"]
+
+
+class WhisperBackend(TranscriptionBackend):
+    """Full-precision Whisper on the default device."""
+
+    name = "whisper"
+
+    def cache_model_id(self, model_name: str) -> str:
+        # Plain model names keep transcripts cached before backends existed valid
+        return model_name
+
+    def load_model(self, model_name: str):
+        return whisper.load_model(model_name)
+
+
+class QuantizedWhisperBackend(TranscriptionBackend):
+    """Whisper with Linear layers dynamically quantized to int8 for CPU."""
+
+    name = "whisper-int8"
+
+    def load_model(self, model_name: str):
+        model = whisper.load_model(model_name, device="cpu")
+        _use_plain_linear(model)
+        return torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+
+def _use_plain_linear(module: torch.nn.Module):
+    """
+    Swaps Whisper's Linear subclass for torch.nn.Linear in place.
+    quantize_dynamic matches exact module types, so subclasses are skipped.
+    """
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+            linear = torch.nn.Linear(
+                child.in_features, child.out_features, bias=child.bias is not None
+            )
+            linear.weight = child.weight
+            linear.bias = child.bias
+            setattr(module, name, linear)
+        else:
+            _use_plain_linear(child)
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    QuantizedWhisperBackend.name: QuantizedWhisperBackend,
+}
+
+_backend_instances: Dict[str, TranscriptionBackend] = {}
+_backend_instances_lock = threading.Lock()
+
+
+def set_num_threads(num_threads: Optional[int] = None):
+    """
+    Sets torch intra-op threads for this worker process.
+    Falls back to WHISPER_NUM_THREADS; leaves torch's default if neither is set.
+    """
+    if num_threads is None and os.getenv("WHISPER_NUM_THREADS"):
+        num_threads = int(os.getenv("WHISPER_NUM_THREADS"))
+    if num_threads and num_threads != torch.get_num_threads():
+        torch.set_num_threads(num_threads)
+
+
+def get_backend(
+    name: str = WhisperBackend.name, num_threads: Optional[int] = None
+) -> TranscriptionBackend:
+    """
+    Returns the shared backend instance for this worker process.
+    The thread count is process-wide and applied on every call.
+    """
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown transcription backend '{name}'. Available: {list(BACKENDS)}"
+        )
+    set_num_threads(num_threads)
+    with _backend_instances_lock:
+        if name not in _backend_instances:
+            _backend_instances[name] = BACKENDS[name]()
+        return _backend_instances[name]
+
+
+def audio_duration(audio_path: str) -> float:
+    """Returns audio duration in seconds using ffprobe."""
+    return float(ffmpeg.probe(audio_path)["format"]["duration"])
+
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """Returns (word-level edit distance, reference word count)."""
+    ref = re.findall(r"\w+", reference.lower())
+    hyp = re.findall(r"\w+", hypothesis.lower())
+    if not ref:
+        return len(hyp), 0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1], len(ref)
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length."""
+    edits, ref_words = word_errors(reference, hypothesis)
+    if not ref_words:
+        return 0.0 if not edits else 1.0
+    return edits / ref_words
+
+
+def load_benchmarks(path: str = BENCHMARK_PATH) -> List[Dict]:
+    """Loads the saved benchmark table, or an empty list if none exists."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_benchmarks(rows: List[Dict], path: str = BENCHMARK_PATH):
+    """Writes the benchmark table atomically."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def run_benchmark(
+    reference_set: List[Dict[str, str]],
+    backend_names: List[str],
+    model_names: List[str],
+    language: str = "tr",
+    num_threads: Optional[int] = None,
+    path: str = BENCHMARK_PATH,
+) -> List[Dict]:
+    """
+    Measures real-time factor and word-error rate for each backend and model.
+
+    reference_set items have "audio_path" and "reference_text". RTF is
+    processing seconds per audio second, so lower is faster. WER is computed
+    over the whole corpus, so long samples weigh more than short ones. Rows
+    replace earlier rows for the same backend, model, thread count and
+    language.
+    """
+    total_audio = sum(audio_duration(item["audio_path"]) for item in reference_set)
+
+    new_rows = []
+    for backend_name in backend_names:
+        backend = get_backend(backend_name, num_threads)
+        for model_name in model_names:
+            # Load outside the timed section; RTF should reflect steady state
+            backend.get_model(model_name)
+            elapsed = 0.0
+            total_edits = 0
+            total_words = 0
+            for item in reference_set:
+                started = time.perf_counter()
+                text = backend.transcribe(item["audio_path"], model_name, language)
+                elapsed += time.perf_counter() - started
+                edits, ref_words = word_errors(item["reference_text"], text)
+                total_edits += edits
+                total_words += ref_words
+
+            row = {
+                "backend": backend_name,
+                "model": model_name,
+                "num_threads": torch.get_num_threads(),
+                "language": language,
+                "rtf": round(elapsed / total_audio, 4) if total_audio else None,
+                "wer": round(total_edits / total_words, 4) if total_words else None,
+                "audio_seconds": round(total_audio, 1),
+            }
+            print(f"Benchmark: {row}")
+            new_rows.append(row)
+
+    def row_key(row):
+        return row["backend"], row["model"], row["num_threads"], row["language"]
+
+    replaced = {row_key(r) for r in new_rows}
+    with _benchmarks_lock:
+        rows = [r for r in load_benchmarks(path) if row_key(r) not in replaced]
+        rows.extend(new_rows)
+        save_benchmarks(rows, path)
+    return rows
+
+
+def select_model_size(
+    backend_name: str,
+    language: str,
+    duration_seconds: Optional[float] = None,
+    target_rtf: Optional[float] = None,
+    time_budget_seconds: Optional[float] = None,
+    benchmarks: Optional[List[Dict]] = None,
+) -> str:
+    """
+    Picks the most accurate benchmarked model that meets the throughput target.
+
+    A per-file time budget is turned into an RTF target using the audio
+    duration, so longer files get smaller models. It takes precedence over
+    target_rtf. With neither, the target is real time (RTF <= 1). Without
+    benchmark rows for the backend and language, DEFAULT_MODEL is used.
+    """
+    if time_budget_seconds and duration_seconds:
+        target_rtf = time_budget_seconds / duration_seconds
+    if target_rtf is None:
+        target_rtf = REALTIME_RTF
+    if benchmarks is None:
+        benchmarks = load_benchmarks()
+
+    rows = [
+        r
+        for r in benchmarks
+        if r["backend"] == backend_name
+        and r.get("language") == language
+        and r.get("rtf") is not None
+    ]
+    if not rows:
+        print(
+            f"No benchmarks for '{backend_name}' ({language}), using '{DEFAULT_MODEL}'"
+        )
+        return DEFAULT_MODEL
+    # Prefer measurements taken with this process's thread count
+    same_threads = [r for r in rows if r["num_threads"] == torch.get_num_threads()]
+    rows = same_threads or rows
+
+    fast_enough = [r for r in rows if r["rtf"] <= target_rtf]
+    if not fast_enough:
+        # Nothing meets the target; take the fastest measured option
+        return min(rows, key=lambda r: r["rtf"])["model"]
+
+    # Prefer lower WER, then the larger model
+    best = min(
+        fast_enough,
+        key=lambda r: (
+            r["wer"] if r.get("wer") is not None else 1.0,
+            -MODEL_SIZES.index(r["model"]) if r["model"] in MODEL_SIZES else 0,
+        ),
+    )
+    return best["model"]